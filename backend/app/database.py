@@ -1,15 +1,18 @@
 import hashlib
+import logging
 import os
 from functools import lru_cache
 from typing import Iterator
 
-from sqlalchemy import create_engine, select
+from sqlalchemy import create_engine, select, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 
 Base = declarative_base()
 
+LOGGER = logging.getLogger(__name__)
+
 
 @lru_cache
 def _database_url() -> str:
@@ -55,9 +58,47 @@ def init_db() -> None:
     from app import models  # noqa: F401
 
     Base.metadata.create_all(bind=engine)
+    _ensure_article_state_cascade()
     _ensure_default_admin()
 
 
+def _ensure_article_state_cascade() -> None:
+    # create_all() does not alter existing tables, so upgrade the FK in place once.
+    if engine.dialect.name != "postgresql":
+        return
+
+    with engine.begin() as connection:
+        constraint = connection.execute(
+            text(
+                "SELECT conname, confdeltype FROM pg_constraint "
+                "WHERE conrelid = 'article_states'::regclass "
+                "AND confrelid = 'article_file_states'::regclass "
+                "AND contype = 'f'"
+            )
+        ).first()
+        if constraint is None:
+            # import_states --reset relies on the cascade to remove article_states rows
+            LOGGER.warning(
+                "Foreign key article_states.file_state_id -> article_file_states.id "
+                "not found; import_states --reset will leave orphaned article_states "
+                "rows until it is restored with ON DELETE CASCADE"
+            )
+            return
+        name, delete_action = constraint
+        if delete_action == "c":
+            return
+        quoted_name = connection.dialect.identifier_preparer.quote(name)
+        connection.execute(
+            text(
+                "ALTER TABLE article_states "
+                f"DROP CONSTRAINT {quoted_name}, "
+                "ADD CONSTRAINT article_states_file_state_id_fkey "
+                "FOREIGN KEY (file_state_id) REFERENCES article_file_states (id) "
+                "ON DELETE CASCADE"
+            )
+        )
+
+
 def _ensure_default_admin() -> None:
     from app.models import User
 
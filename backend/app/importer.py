@@ -81,9 +81,10 @@ def _detect_structure_issues(lines: Sequence[str]) -> List[Dict[str, Any]]:
     issues: List[Dict[str, Any]] = []
     idx = 0
     current_headers: List[Dict[str, Any]] = []
+    stripped_lines = [line.strip() for line in lines]
 
     while idx < len(lines):
-        stripped = lines[idx].strip()
+        stripped = stripped_lines[idx]
 
         if not stripped:
             current_headers = []
@@ -92,8 +93,8 @@ def _detect_structure_issues(lines: Sequence[str]) -> List[Dict[str, Any]]:
 
         if STRUCTURE_HEADER_PATTERN.match(stripped):
             header_block: List[Dict[str, Any]] = []
-            while idx < len(lines) and STRUCTURE_HEADER_PATTERN.match(lines[idx].strip()):
-                header_block.append({"line": idx + 1, "header": lines[idx].strip()})
+            while idx < len(lines) and STRUCTURE_HEADER_PATTERN.match(stripped_lines[idx]):
+                header_block.append({"line": idx + 1, "header": stripped_lines[idx]})
                 idx += 1
 
             current_headers = header_block
@@ -108,7 +109,7 @@ def _detect_structure_issues(lines: Sequence[str]) -> List[Dict[str, Any]]:
                 )
                 break
 
-            next_stripped = lines[idx].strip()
+            next_stripped = stripped_lines[idx]
             if not next_stripped or not STRUCTURE_WORD_PATTERN.match(next_stripped):
                 issues.append(
                     {
@@ -106,6 +106,7 @@ class ArticleFileState(Base):
         "ArticleState",
         back_populates="file_state",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
 
@@ -121,7 +122,9 @@ class ArticleState(Base):
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    file_state_id: Mapped[int] = mapped_column(ForeignKey("article_file_states.id"), nullable=False)
+    file_state_id: Mapped[int] = mapped_column(
+        ForeignKey("article_file_states.id", ondelete="CASCADE"), nullable=False
+    )
     article_index: Mapped[int] = mapped_column(Integer, nullable=False)
     canonical_key: Mapped[str] = mapped_column(String(255), nullable=False)
     canonical_occurrence: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
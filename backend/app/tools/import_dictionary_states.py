@@ -2,34 +2,124 @@ from __future__ import annotations
 
 import argparse
 import json
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Optional, Sequence, Tuple
 
-from sqlalchemy import delete, select
+from sqlalchemy import delete, insert, select, update
 
 from app.database import SessionLocal, init_db
 from app.models import ArticleChangeLog, ArticleFileState, ArticleState
 from app.services.article_tracking import extract_canonical_key
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
 
+try:
+    import ijson
+except ImportError:  # pragma: no cover - ijson is only needed for --stream
+    ijson = None
+
+STATE_HEADER_KEYS = ("last_script_run_date", "file_modified_time")
+
+# Соседние статьи часто делят одну и ту же строку key_info
+_cached_canonical_key = lru_cache(maxsize=65536)(extract_canonical_key)
+
+
+DATETIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M")
+# Формат, сработавший последним, пробуем первым: в одном каталоге он обычно общий
+_last_datetime_format = [DATETIME_FORMATS[0]]
+
+
+@lru_cache(maxsize=4096)
 def parse_datetime(value: Optional[str]) -> Optional[datetime]:
     if not value:
         return None
-    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"):
+    preferred = _last_datetime_format[0]
+    try:
+        return datetime.strptime(value, preferred)
+    except ValueError:
+        pass
+    for fmt in DATETIME_FORMATS:
+        if fmt == preferred:
+            continue
         try:
-            return datetime.strptime(value, fmt)
+            parsed = datetime.strptime(value, fmt)
         except ValueError:
             continue
+        _last_datetime_format[0] = fmt
+        return parsed
     return None
 
 
 def load_state_file(path: Path) -> Dict[str, Any]:
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
     with path.open("r", encoding="utf-8") as f:
         return json.load(f)
 
 
-def import_states(state_dir: Path, lang: str, reset: bool = False) -> None:
+def _iter_streamed_articles(path: Path, data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    # Один проход по файлу: статьи отдаются по мере разбора, а даты верхнего
+    # уровня записываются в data, где бы они ни стояли относительно "articles".
+    builder = None
+    with path.open("rb") as f:
+        for prefix, event, value in ijson.parse(f):
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == "articles.item" and event in ("end_map", "end_array"):
+                    yield builder.value
+                    builder = None
+            elif prefix == "articles.item" and event in ("start_map", "start_array"):
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+            elif prefix in STATE_HEADER_KEYS and event in ("string", "null"):
+                data[prefix] = value
+
+
+def stream_state_file(path: Path) -> Dict[str, Any]:
+    data: Dict[str, Any] = {}
+    data["articles"] = _iter_streamed_articles(path, data)
+    return data
+
+
+def iter_state_files(
+    files: Sequence[Path],
+    workers: int = 4,
+    loader: Callable[[Path], Dict[str, Any]] = load_state_file,
+) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+    if workers <= 1:
+        for path in files:
+            yield path, loader(path)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Tuple[Path, Future]] = deque()
+        for path in files:
+            pending.append((path, pool.submit(loader, path)))
+            if len(pending) > workers:
+                done_path, future = pending.popleft()
+                yield done_path, future.result()
+        while pending:
+            done_path, future = pending.popleft()
+            yield done_path, future.result()
+
+
+def import_states(
+    state_dir: Path,
+    lang: str,
+    reset: bool = False,
+    workers: int = 4,
+    stream: bool = False,
+) -> None:
+    if stream and ijson is None:
+        raise RuntimeError("Для --stream требуется пакет ijson")
     init_db()
     state_dir = state_dir.resolve()
     files = sorted(state_dir.glob("*.json"))
@@ -42,83 +132,98 @@ def import_states(state_dir: Path, lang: str, reset: bool = False) -> None:
             session.execute(
                 delete(ArticleChangeLog).where(ArticleChangeLog.file_state_id.in_(state_ids))
             )
-            session.execute(
-                delete(ArticleState).where(
-                    ArticleState.file_state_id.in_(
-                        select(ArticleFileState.id).where(ArticleFileState.lang == lang)
-                    )
-                )
-            )
+            # article_states rows go away via ON DELETE CASCADE
             session.execute(delete(ArticleFileState).where(ArticleFileState.lang == lang))
             session.commit()
 
-        for json_file in files:
-            data = load_state_file(json_file)
-            articles = data.get("articles", [])
-            if not articles:
+        existing_files: Dict[str, int] = {
+            file_path: file_state_id
+            for file_state_id, file_path in session.execute(
+                select(ArticleFileState.id, ArticleFileState.file_path).where(
+                    ArticleFileState.lang == lang
+                )
+            )
+        }
+
+        loader = stream_state_file if stream else load_state_file
+        for _, data in iter_state_files(files, workers, loader):
+            articles = iter(data.get("articles") or ())
+            first_article = next(articles, None)
+            if first_article is None:
                 continue
 
-            first_article = articles[0]
             file_path = first_article.get("file_path")
             if not file_path:
                 continue
 
-            stmt = (
-                select(ArticleFileState)
-                .where(ArticleFileState.lang == lang)
-                .where(ArticleFileState.file_path == file_path)
-                .limit(1)
-            )
-            file_state = session.execute(stmt).scalar_one_or_none()
-            if file_state is None:
+            file_state_id = existing_files.get(file_path)
+            existing_states: Dict[Tuple[str, int], int] = {}
+            if file_state_id is None:
                 file_state = ArticleFileState(
                     lang=lang,
                     file_path=file_path,
                 )
                 session.add(file_state)
                 session.flush()
+                file_state_id = existing_files[file_path] = file_state.id
+            else:
+                existing_states = {
+                    (canonical_key, occurrence): state_id
+                    for state_id, canonical_key, occurrence in session.execute(
+                        select(
+                            ArticleState.id,
+                            ArticleState.canonical_key,
+                            ArticleState.canonical_occurrence,
+                        ).where(ArticleState.file_state_id == file_state_id)
+                    )
+                }
 
-            file_state.last_run_at = parse_datetime(data.get("last_script_run_date"))
-            file_state.last_modified_at = parse_datetime(data.get("file_modified_time"))
-
-            for index, article in enumerate(articles):
-                canonical_key = article.get("canonical_key") or extract_canonical_key(
+            new_rows: Dict[Tuple[str, int], Dict[str, Any]] = {}
+            updated_rows: Dict[int, Dict[str, Any]] = {}
+            for index, article in enumerate(chain((first_article,), articles)):
+                canonical_key = article.get("canonical_key") or _cached_canonical_key(
                     article.get("key_info", "")
                 )
                 if not canonical_key:
                     canonical_key = f"__article_{index}"
                 occurrence = article.get("canonical_occurrence") or 0
-                checksum = article.get("checksum") or ""
-                last_header = article.get("last_edited_line")
-
-                stmt_state = (
-                    select(ArticleState)
-                        .where(ArticleState.file_state_id == file_state.id)
-                        .where(ArticleState.canonical_key == canonical_key)
-                        .where(ArticleState.canonical_occurrence == occurrence)
-                        .limit(1)
-                )
-                state = session.execute(stmt_state).scalar_one_or_none()
-                if state is None:
-                    state = ArticleState(
-                        file_state=file_state,
-                        article_index=index,
-                        canonical_key=canonical_key,
-                        canonical_occurrence=occurrence,
-                        checksum=checksum,
-                        last_header_line=last_header,
-                        last_seen_at=file_state.last_run_at,
-                    )
-                    session.add(state)
+                row = {
+                    "article_index": index,
+                    "canonical_key": canonical_key,
+                    "canonical_occurrence": occurrence,
+                    "checksum": article.get("checksum") or "",
+                    "last_header_line": article.get("last_edited_line"),
+                }
+
+                state_id = existing_states.get((canonical_key, occurrence))
+                if state_id is None:
+                    new_rows[(canonical_key, occurrence)] = {
+                        "file_state_id": file_state_id,
+                        **row,
+                    }
                 else:
-                    state.article_index = index
-                    state.canonical_key = canonical_key
-                    state.canonical_occurrence = occurrence
-                    state.checksum = checksum
-                    state.last_header_line = last_header
-                    state.last_seen_at = file_state.last_run_at
+                    updated_rows[state_id] = {"id": state_id, **row}
 
-        session.commit()
+            # В режиме --stream даты заполняются по ходу разбора и могут стоять
+            # после массива статей, поэтому читаем их только после прохода
+            last_run_at = parse_datetime(data.get("last_script_run_date"))
+            last_modified_at = parse_datetime(data.get("file_modified_time"))
+            session.execute(
+                update(ArticleFileState)
+                .where(ArticleFileState.id == file_state_id)
+                .values(last_run_at=last_run_at, last_modified_at=last_modified_at)
+            )
+            for row in chain(new_rows.values(), updated_rows.values()):
+                row["last_seen_at"] = last_run_at
+
+            if new_rows:
+                session.execute(insert(ArticleState), list(new_rows.values()))
+            if updated_rows:
+                session.execute(update(ArticleState), list(updated_rows.values()))
+
+            # Один файл — одна транзакция: память сессии не растёт с размером каталога
+            session.commit()
+            session.expunge_all()
 
 
 def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
@@ -143,12 +248,32 @@ def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
         action="store_true",
         help="Удалить существующие записи для указанного языка перед импортом.",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Читать статьи потоково через ijson за один проход по файлу "
+            "(для очень больших файлов состояний)."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Сколько JSON-файлов разбирать параллельно с записью в БД (1 — последовательно).",
+    )
     return parser.parse_args(argv)
 
 
 def main(argv: Optional[Iterable[str]] = None) -> None:
     args = parse_args(argv)
-    import_states(args.state_dir, args.lang, reset=args.reset)
+    import_states(
+        args.state_dir,
+        args.lang,
+        reset=args.reset,
+        workers=args.workers,
+        stream=args.stream,
+    )
 
 
 if __name__ == "__main__":
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from functools import lru_cache
-from typing import Dict
+import re
+from typing import Dict, Pattern
 
 _UX_TO_LETTER = {
     "Cx": "Ĉ",
@@ -51,26 +51,33 @@ _CARET_MAP = {
 }
 
 
-@lru_cache(maxsize=None)
-def _entity_to_ux_map() -> Dict[str, str]:
-    return {entity: _LETTER_TO_UX[letter] for entity, letter in _ENTITY_TO_LETTER.items()}
+_ENTITY_TO_UX = {entity: _LETTER_TO_UX[letter] for entity, letter in _ENTITY_TO_LETTER.items()}
+
+
+def _compile_alternation(mapping: Dict[str, str]) -> Pattern[str]:
+    return re.compile("|".join(re.escape(key) for key in mapping))
+
+
+_ENTITY_TO_UX_RE = _compile_alternation(_ENTITY_TO_UX)
+_CARET_RE = _compile_alternation(_CARET_MAP)
 
 
 def oh_sencxapeligo(text: str) -> str:
     """Convert ^C style digraphs to ux format."""
-    for src, dst in _CARET_MAP.items():
-        text = text.replace(src, dst)
-    return text
+    return _CARET_RE.sub(lambda match: _CARET_MAP[match.group(0)], text)
 
 
 def cxapeligo(text: str) -> str:
     """Convert ux digraphs to accented Esperanto characters."""
     if not text:
         return text
-    for ux, letter in _UX_TO_LETTER.items():
-        text = text.replace(ux, letter)
-    for entity, letter in _ENTITY_TO_LETTER.items():
-        text = text.replace(entity, letter)
+    # A regex callback per match is slower than str.replace on ux-dense articles
+    if "x" in text:
+        for ux, letter in _UX_TO_LETTER.items():
+            text = text.replace(ux, letter)
+    if "&#" in text:
+        for entity, letter in _ENTITY_TO_LETTER.items():
+            text = text.replace(entity, letter)
     return text
 
 
@@ -78,11 +85,13 @@ def sencxapeligo(text: str) -> str:
     """Convert accented Esperanto characters to ux digraphs."""
     if not text:
         return text
-    for letter, ux in _LETTER_TO_UX.items():
-        text = text.replace(letter, ux)
-    for entity, ux in _entity_to_ux_map().items():
-        text = text.replace(entity, ux)
-    return text
+    # str.translate with one-to-two mappings is far slower than replace on long text
+    if not text.isascii():
+        for letter, ux in _LETTER_TO_UX.items():
+            text = text.replace(letter, ux)
+    if "&#" not in text:
+        return text
+    return _ENTITY_TO_UX_RE.sub(lambda match: _ENTITY_TO_UX[match.group(0)], text)
 
 
 def urlsencxapeligo(text: str) -> str:
@@ -8,12 +8,46 @@ import argparse
 import json
 import re
 import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+SOURCE_ENCODING = "cp1251"
+
+# Паттерны заголовка и слова из importer.py, объединённые в один автомат
+# (в байтовом виде: файлы читаются без декодирования)
+STRUCTURE_LINE_PATTERN = re.compile(
+    rb"(?P<header>\d{4}-\d{2}-\d{2} \d{1,2}:\d{2} [A-Za-z0-9_]+#?)$"
+    rb"|(?P<word>\[[^\]]+\])"
+)
+
+# Байты CP1251, которые str.strip() считает пробельными (включая NBSP 0xA0)
+WHITESPACE_BYTES = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f\xa0"
+
+
+def _decode(line: bytes) -> str:
+    return line.decode(SOURCE_ENCODING)
+
+
+def _is_header_candidate(line: bytes) -> bool:
+    """Дешёвая проверка префикса даты перед полным разбором заголовка."""
+    return (
+        len(line) >= 10
+        and line[:4].isdigit()
+        and line[4:5] == b"-"
+        and line[5:7].isdigit()
+        and line[7:8] == b"-"
+    )
+
+
+def _classify_line(line: bytes) -> Optional[str]:
+    """Возвращает "header", "word" или None для очищенной строки."""
+    if line[:1] != b"[" and not _is_header_candidate(line):
+        return None
+    match = STRUCTURE_LINE_PATTERN.match(line)
+    return match.lastgroup if match else None
 
-# Паттерны из importer.py
-STRUCTURE_HEADER_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2} \d{1,2}:\d{2} [A-Za-z0-9_]+#?$")
-STRUCTURE_WORD_PATTERN = re.compile(r"^\[[^\]]+\]")
 
 # Файлы с ожидаемыми структурными особенностями (исключения из отчёта)
 STRUCTURE_ISSUE_EXCEPTIONS = {
@@ -22,27 +56,33 @@ STRUCTURE_ISSUE_EXCEPTIONS = {
 }
 
 
-def _detect_structure_issues(lines: List[str]) -> List[Dict[str, Any]]:
+def _detect_structure_issues(lines: List[bytes]) -> List[Dict[str, Any]]:
     """
     Обнаруживает структурные проблемы в файле словаря.
+    Принимает строки файла в исходной кодировке (bytes); в str декодируются
+    только строки, попадающие в отчёт.
     Возвращает список проблем с деталями.
     """
     issues: List[Dict[str, Any]] = []
     idx = 0
     current_headers: List[Dict[str, Any]] = []
+    stripped_lines = [line.strip(WHITESPACE_BYTES) for line in lines]
+    # Каждая строка проходит через регулярное выражение не более одного раза
+    kinds = [_classify_line(stripped) for stripped in stripped_lines]
 
     while idx < len(lines):
-        stripped = lines[idx].strip()
+        stripped = stripped_lines[idx]
 
         if not stripped:
             current_headers = []
             idx += 1
             continue
 
-        if STRUCTURE_HEADER_PATTERN.match(stripped):
+        kind = kinds[idx]
+        if kind == "header":
             header_block: List[Dict[str, Any]] = []
-            while idx < len(lines) and STRUCTURE_HEADER_PATTERN.match(lines[idx].strip()):
-                header_block.append({"line": idx + 1, "header": lines[idx].strip()})
+            while idx < len(lines) and kinds[idx] == "header":
+                header_block.append({"line": idx + 1, "header": _decode(stripped_lines[idx])})
                 idx += 1
 
             current_headers = header_block
@@ -57,24 +97,24 @@ def _detect_structure_issues(lines: List[str]) -> List[Dict[str, Any]]:
                 )
                 break
 
-            next_stripped = lines[idx].strip()
-            if not next_stripped or not STRUCTURE_WORD_PATTERN.match(next_stripped):
+            next_stripped = stripped_lines[idx]
+            if not next_stripped or kinds[idx] != "word":
                 issues.append(
                     {
                         "type": "header_without_word",
                         "headers": header_block,
-                        "next_line": next_stripped,
+                        "next_line": _decode(next_stripped),
                     }
                 )
             continue
 
-        if STRUCTURE_WORD_PATTERN.match(stripped) and not current_headers:
+        if kind == "word" and not current_headers:
             issues.append(
                 {
                     "type": "word_without_header",
                     "line": idx + 1,
-                    "word": stripped,
-                    "context": lines[max(0, idx - 3) : idx + 2],
+                    "word": _decode(stripped),
+                    "context": [_decode(line) for line in lines[max(0, idx - 3) : idx + 2]],
                 }
             )
 
@@ -83,7 +123,30 @@ def _detect_structure_issues(lines: List[str]) -> List[Dict[str, Any]]:
     return issues
 
 
-def check_language_files(data_dir: Path, lang: str) -> Dict[str, Any]:
+def _scan_one_file(file_path: Path) -> Tuple[Path, List[Dict[str, Any]], Optional[str]]:
+    """
+    Проверяет один файл. Функция верхнего уровня, чтобы её можно было
+    передавать в ProcessPoolExecutor; ошибки возвращаются, а не пробрасываются.
+    """
+    try:
+        # Файлы в CP1251 (однобайтовая): разбираем байты, не декодируя весь текст
+        lines = file_path.read_bytes().splitlines()
+        return file_path, _detect_structure_issues(lines), None
+    except Exception as e:
+        return file_path, [], str(e)
+
+
+def _scan_files(
+    files: Sequence[Path], pool: Optional[Executor]
+) -> Iterator[Tuple[Path, List[Dict[str, Any]], Optional[str]]]:
+    if pool is None or len(files) < 2:
+        return map(_scan_one_file, files)
+    return pool.map(_scan_one_file, files, chunksize=4)
+
+
+def check_language_files(
+    data_dir: Path, lang: str, pool: Optional[Executor] = None
+) -> Dict[str, Any]:
     """
     Проверяет все файлы языка на структурные проблемы.
     """
@@ -104,25 +167,19 @@ def check_language_files(data_dir: Path, lang: str) -> Dict[str, Any]:
     total_issues = 0
     exceptions = STRUCTURE_ISSUE_EXCEPTIONS.get(lang, [])
 
-    for file_path in files:
-        try:
-            # Читаем в CP1251 для эсперанто/русских словарей
-            raw = file_path.read_bytes()
-            text = raw.decode("cp1251")
-            lines = text.splitlines()
-
-            issues = _detect_structure_issues(lines)
-
-            if issues:
-                # Пропускаем файлы в списке исключений
-                if file_path.name not in exceptions:
-                    rel_path = f"{lang_dir_name}/{file_path.name}"
-                    results[rel_path] = issues
-                    total_issues += len(issues)
-                else:
-                    print(f"ℹ️  Исключённый файл {file_path.name}: {len(issues)} пропущено", file=sys.stderr)
-        except Exception as e:
-            print(f"⚠️  Ошибка чтения {file_path.name}: {e}", file=sys.stderr)
+    for file_path, issues, error in _scan_files(files, pool):
+        if error is not None:
+            print(f"⚠️  Ошибка чтения {file_path.name}: {error}", file=sys.stderr)
+            continue
+
+        if issues:
+            # Пропускаем файлы в списке исключений
+            if file_path.name not in exceptions:
+                rel_path = f"{lang_dir_name}/{file_path.name}"
+                results[rel_path] = issues
+                total_issues += len(issues)
+            else:
+                print(f"ℹ️  Исключённый файл {file_path.name}: {len(issues)} пропущено", file=sys.stderr)
 
     return {
         "lang": lang,
@@ -231,6 +288,17 @@ def main():
         action="store_true",
         help="Вывод в формате tracking-summary.json (совместимо с importer.py)",
     )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Форматировать JSON с отступами (по умолчанию компактный вывод для скриптов)",
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="Число процессов для проверки файлов (default: по числу ядер; <= 1 — без пула)",
+    )
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -247,18 +315,25 @@ def main():
     languages = ["eo", "ru"] if args.lang == "all" else [args.lang]
     results = {}
 
-    for lang in languages:
-        result = check_language_files(data_dir, lang)
-        results[lang] = result
+    # Один пул на все языки; --jobs <= 1 — последовательная проверка, как --workers в импорте
+    sequential = args.jobs is not None and args.jobs <= 1
+    with nullcontext() if sequential else ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        for lang in languages:
+            result = check_language_files(data_dir, lang, pool=pool)
+            results[lang] = result
+
+    json_options: Dict[str, Any] = (
+        {"indent": 2} if args.pretty else {"separators": (",", ":")}
+    )
 
     if args.tracking_format:
         # Формат для обновления tracking-summary.json
         tracking_data = {}
         for lang, result in results.items():
             tracking_data[lang] = {"structure_issues": format_for_tracking_summary(result)}
-        print(json.dumps(tracking_data, ensure_ascii=False, indent=2))
+        print(json.dumps(tracking_data, ensure_ascii=False, **json_options))
     elif args.json:
-        print(json.dumps(results, ensure_ascii=False, indent=2))
+        print(json.dumps(results, ensure_ascii=False, **json_options))
     else:
         for lang, result in results.items():
             if result.get("total_issues", 0) > 0: